@@ -0,0 +1,262 @@
+"""Latency benchmark for the shared Google transport in google_transport.py.
+
+Runs the gspread-side session and the Drive service pool against a local mock
+server at 1, 10 and 50 concurrent sessions, next to the old behaviour of
+building a fresh client on every script rerun. The mock speaks plain HTTP, so
+--handshake-ms adds a delay to every new connection to stand in for TLS setup.
+
+    python bench_transport.py [--requests 20] [--handshake-ms 30] [--server-ms 5]
+"""
+import argparse
+import datetime
+import gzip
+import json
+import logging
+import statistics
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import google_auth_httplib2
+from google.auth.credentials import Credentials
+from google.auth.transport.requests import AuthorizedSession
+from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+
+from google_transport import SharedCredentials, make_authorized_session, DriveServicePool
+
+CONCURRENCY = [1, 10, 50]
+POOL_SIZE = 20
+PAYLOAD = json.dumps({
+    "files": [{"id": f"sheet-{i}", "name": f"Completion Times {i}"} for i in range(300)]
+}).encode()
+
+
+# --------------------------
+# MOCK SERVER
+# --------------------------
+
+class Stats:
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.reset()
+
+    def reset(self):
+        self.connections = 0
+        self.requests = 0
+        self.gzipped = 0
+
+    def add(self, **counts):
+        with self.lock:
+            for key, value in counts.items():
+                setattr(self, key, getattr(self, key) + value)
+
+
+class MockHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive
+    # Headers and body go out in separate writes; without this, Nagle plus the
+    # client's delayed ACK adds ~40 ms to every request on a reused connection.
+    disable_nagle_algorithm = True
+
+    def setup(self):
+        super().setup()
+        self.server.stats.add(connections=1)
+        time.sleep(self.server.handshake_s)
+
+    def do_GET(self):
+        time.sleep(self.server.server_s)
+        body = PAYLOAD
+        # Same rule as Google: gzip only when asked for AND the UA says gzip
+        use_gzip = ("gzip" in self.headers.get("Accept-Encoding", "")
+                    and "gzip" in self.headers.get("User-Agent", ""))
+        if use_gzip:
+            body = gzip.compress(body)
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        if use_gzip:
+            self.send_header("Content-Encoding", "gzip")
+        self.end_headers()
+        self.wfile.write(body)
+        self.server.stats.add(requests=1, gzipped=int(use_gzip))
+
+    def log_message(self, *args):
+        pass
+
+
+def start_server(handshake_ms, server_ms):
+    server = ThreadingHTTPServer(("127.0.0.1", 0), MockHandler)
+    server.daemon_threads = True
+    server.request_queue_size = 128
+    server.stats = Stats()
+    server.handshake_s = handshake_ms / 1000
+    server.server_s = server_ms / 1000
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server
+
+
+# --------------------------
+# CLIENTS
+# --------------------------
+
+class StubCredentials(Credentials):
+    # Stands in for the service account; counts how often a token is fetched
+    def __init__(self):
+        super().__init__()
+        self.refreshes = 0
+
+    def refresh(self, request):
+        time.sleep(0.05)  # token endpoint round trip, widens any refresh race
+        self.refreshes += 1
+        self.token = f"token-{self.refreshes}"
+        self.expiry = datetime.datetime.utcnow() + datetime.timedelta(hours=1)
+
+
+def sheets_per_call(base_url, credentials):
+    # Old behaviour: a new client (and connection) per script rerun
+    def call():
+        session = AuthorizedSession(credentials)
+        session.headers["User-Agent"] = f"{session.headers['User-Agent']} (gzip)"
+        try:
+            return check_gzip(session.get(f"{base_url}/v4/spreadsheets/x"))
+        finally:
+            session.close()
+    return call, None
+
+
+def sheets_pooled(base_url, credentials):
+    session = make_authorized_session(credentials, POOL_SIZE)
+    def call():
+        return check_gzip(session.get(f"{base_url}/v4/spreadsheets/x"))
+    return call, session
+
+
+def check_gzip(resp):
+    resp.raise_for_status()
+    assert resp.headers.get("Content-Encoding") == "gzip", resp.headers
+    return resp.json()
+
+
+def drive_build(credentials, base_url):
+    http = google_auth_httplib2.AuthorizedHttp(credentials, http=build_http())
+    return build('drive', 'v3', http=http, cache_discovery=False,
+                 client_options={"api_endpoint": f"{base_url}/"})
+
+
+def drive_per_call(base_url, credentials):
+    def call():
+        return drive_build(credentials, base_url).files().list(fields="files(id, name)").execute()
+    return call, None
+
+
+def drive_pooled(base_url, credentials):
+    pool = DriveServicePool(credentials, POOL_SIZE, client_options={"api_endpoint": f"{base_url}/"})
+    def call():
+        with pool.service() as drive:
+            return drive.files().list(fields="files(id, name)").execute()
+    return call, None
+
+
+SCENARIOS = [
+    ("sheets", "per-call", sheets_per_call),
+    ("sheets", "pooled", sheets_pooled),
+    ("drive", "per-call", drive_per_call),
+    ("drive", "pooled", drive_pooled),
+]
+
+
+# --------------------------
+# RUNNER
+# --------------------------
+
+def run(server, factory, sessions, requests_per_session, shared):
+    base_url = f"http://127.0.0.1:{server.server_address[1]}"
+    stub = StubCredentials()
+    credentials = SharedCredentials(stub) if shared else stub
+    call, resource = factory(base_url, credentials)
+    call()  # warm up: token fetch, discovery parse, first connection
+    server.stats.reset()
+    latencies = []
+    lock = threading.Lock()
+
+    def session():
+        for _ in range(requests_per_session):
+            start = time.perf_counter()
+            result = call()
+            elapsed = time.perf_counter() - start
+            assert len(result["files"]) == 300
+            with lock:
+                latencies.append(elapsed)
+
+    wall = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=sessions) as executor:
+        for future in [executor.submit(session) for _ in range(sessions)]:
+            future.result()
+    wall = time.perf_counter() - wall
+
+    if resource is not None:
+        resource.close()
+    stats = server.stats
+    assert stats.gzipped == stats.requests, "responses were not gzip encoded"
+    if shared:
+        assert stub.refreshes == 1, f"token fetched {stub.refreshes} times"
+    latencies.sort()
+    return {
+        "p50": statistics.median(latencies) * 1000,
+        "p95": latencies[int(len(latencies) * 0.95) - 1] * 1000,
+        "rps": len(latencies) / wall,
+        "connections": stats.connections,
+        "requests": stats.requests,
+    }
+
+
+def check_refresh_race(sessions=50):
+    # Expired token, N threads hit before_request() at once
+    results = {}
+    for label, wrap in [("unlocked", False), ("locked", True)]:
+        stub = StubCredentials()
+        credentials = SharedCredentials(stub) if wrap else stub
+        barrier = threading.Barrier(sessions)
+
+        def worker():
+            barrier.wait()
+            credentials.before_request(None, "GET", "http://mock/", {})
+
+        with ThreadPoolExecutor(max_workers=sessions) as executor:
+            for future in [executor.submit(worker) for _ in range(sessions)]:
+                future.result()
+        results[label] = stub.refreshes
+    assert results["locked"] == 1, results
+    return results
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--requests", type=int, default=20, help="requests per session")
+    parser.add_argument("--handshake-ms", type=float, default=30, help="simulated TLS setup per connection")
+    parser.add_argument("--server-ms", type=float, default=5, help="simulated server time per request")
+    args = parser.parse_args()
+    # urllib3 warns whenever more than POOL_SIZE connections are in flight
+    logging.getLogger("urllib3.connectionpool").setLevel(logging.ERROR)
+
+    server = start_server(args.handshake_ms, args.server_ms)
+    print(f"{args.requests} requests/session, handshake {args.handshake_ms:g} ms, "
+          f"server {args.server_ms:g} ms, pool size {POOL_SIZE}\n")
+    print(f"{'client':<7} {'transport':<9} {'sessions':>8} {'p50 ms':>8} {'p95 ms':>8} "
+          f"{'req/s':>8} {'conns':>6}")
+    for client, transport, factory in SCENARIOS:
+        for sessions in CONCURRENCY:
+            r = run(server, factory, sessions, args.requests, shared=transport == "pooled")
+            print(f"{client:<7} {transport:<9} {sessions:>8} {r['p50']:>8.1f} {r['p95']:>8.1f} "
+                  f"{r['rps']:>8.0f} {r['connections']:>6}")
+    server.shutdown()
+
+    race = check_refresh_race()
+    print(f"\ntoken fetches with 50 sessions on an expired token: "
+          f"unlocked={race['unlocked']} locked={race['locked']}")
+    print("all responses gzip encoded")
+
+
+if __name__ == "__main__":
+    main()
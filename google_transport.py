@@ -0,0 +1,101 @@
+import queue
+import threading
+from contextlib import contextmanager
+
+import google_auth_httplib2
+from google.auth.credentials import Credentials
+from google.auth.transport.requests import AuthorizedSession
+from googleapiclient.discovery import build
+from googleapiclient.http import build_http
+from requests.adapters import HTTPAdapter
+
+# --------------------------
+# SHARED GOOGLE TRANSPORT
+# --------------------------
+# Kept free of st.* so it can be imported (and benchmarked) outside Streamlit.
+
+
+class SharedCredentials(Credentials):
+    # Wraps real credentials so concurrent sessions refresh the token once,
+    # under a lock, instead of racing each other inside before_request().
+    def __init__(self, credentials):
+        super().__init__()
+        self._credentials = credentials
+        self._quota_project_id = getattr(credentials, "quota_project_id", None)
+        self._refresh_lock = threading.Lock()
+
+    def refresh(self, request):
+        stale_token = self.token
+        with self._refresh_lock:
+            # Another thread may have refreshed while we waited on the lock
+            if self._credentials.token == stale_token or not self._credentials.valid:
+                self._credentials.refresh(request)
+            self.token = self._credentials.token
+            self.expiry = self._credentials.expiry
+
+
+def make_authorized_session(credentials, pool_size):
+    session = AuthorizedSession(credentials)
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    # requests already sends "Accept-Encoding: gzip, deflate", but Google only
+    # gzips responses when the User-Agent also mentions gzip. Keep the default
+    # python-requests identifier and just append the marker.
+    session.headers["User-Agent"] = f"{session.headers['User-Agent']} (gzip)"
+    return session
+
+
+class DriveServicePool:
+    # googleapiclient services sit on httplib2, which isn't thread-safe, so
+    # each service is checked out by one caller at a time and handed back
+    # afterwards. Services (and their kept-alive connections) are built lazily
+    # up to `size` and then reused for the life of the pool. A caller that
+    # can't get a service within `checkout_timeout` seconds gets a TimeoutError
+    # rather than blocking its session forever.
+    def __init__(self, credentials, size, checkout_timeout=60, **build_kwargs):
+        self._credentials = credentials
+        self._size = size
+        self._checkout_timeout = checkout_timeout
+        self._build_kwargs = build_kwargs
+        self._idle = queue.Queue()
+        self._created = 0
+        self._lock = threading.Lock()
+
+    def _build(self):
+        # build_http() matches what build(credentials=...) uses: a socket
+        # timeout, and 308 left alone for resumable uploads
+        http = google_auth_httplib2.AuthorizedHttp(self._credentials, http=build_http())
+        return build('drive', 'v3', http=http, cache_discovery=False, **self._build_kwargs)
+
+    def _checkout(self):
+        try:
+            return self._idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self._lock:
+            can_build = self._created < self._size
+            if can_build:
+                self._created += 1
+        if can_build:
+            try:
+                return self._build()
+            except Exception:
+                with self._lock:
+                    self._created -= 1
+                raise
+        try:
+            return self._idle.get(timeout=self._checkout_timeout)
+        except queue.Empty:
+            raise TimeoutError(
+                f"No Drive service free after {self._checkout_timeout}s "
+                f"({self._size} in use)"
+            ) from None
+
+    @contextmanager
+    def service(self):
+        service = self._checkout()
+        try:
+            yield service
+        finally:
+            self._idle.put(service)
@@ -3,7 +3,6 @@ import json
 import streamlit as st
 import streamlit_authenticator as stauth
 import gspread
-from googleapiclient.discovery import build
 from google.oauth2.service_account import Credentials
 import datetime
 import pytz
@@ -14,6 +13,7 @@ import uuid
 import pandas as pd
 import plotly.express as px
 import time
+from google_transport import SharedCredentials, make_authorized_session, DriveServicePool
 
 # --------------------------
 # GLOBAL CONSTANTS & CONFIG
@@ -39,6 +39,7 @@ SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets",
     "https://www.googleapis.com/auth/drive"
 ]
+HTTP_POOL_SIZE = 20  # kept-alive connections (gspread) and Drive services per process
 
 # Service Types & Statuses
 SERVICE_TYPES = ["MSW", "SS", "YW"]
@@ -54,9 +55,24 @@ TODAY = datetime.datetime.now(NY_TZ).date()
 THIS_MONTH = TODAY.strftime("%Y-%m")
 
 # Google API Auth
-CREDENTIALS_GS = Credentials.from_service_account_info(SERVICE_ACCOUNT_INFO, scopes=SCOPES)
-GS_CLIENT = gspread.authorize(CREDENTIALS_GS)
-DRIVE_SERVICE = build('drive', 'v3', credentials=CREDENTIALS_GS)
+# Built once per server process (not per script rerun) so every session shares
+# one token, one gspread connection pool and one pool of Drive services.
+@st.cache_resource
+def get_google_credentials():
+    return SharedCredentials(
+        Credentials.from_service_account_info(SERVICE_ACCOUNT_INFO, scopes=SCOPES)
+    )
+
+@st.cache_resource
+def get_gs_client():
+    session = make_authorized_session(get_google_credentials(), HTTP_POOL_SIZE)
+    return gspread.Client(auth=get_google_credentials(), session=session)
+
+@st.cache_resource
+def get_drive_pool():
+    return DriveServicePool(get_google_credentials(), HTTP_POOL_SIZE)
+
+GS_CLIENT = get_gs_client()
 
 # Dropbox Auth
 APP_KEY = st.secrets["dropbox"]["app_key"]
@@ -222,10 +238,11 @@ def get_tab_records(day="today"):
     sheet_title = get_sheet_title(date)
     tab_name = get_today_tab_name(date)
     # Find the sheet ID
-    results = DRIVE_SERVICE.files().list(
-        q=f"'{FOLDER_ID}' in parents and name='{sheet_title}' and mimeType='application/vnd.google-apps.spreadsheet'",
-        fields="files(id, name)"
-    ).execute()
+    with get_drive_pool().service() as drive:
+        results = drive.files().list(
+            q=f"'{FOLDER_ID}' in parents and name='{sheet_title}' and mimeType='application/vnd.google-apps.spreadsheet'",
+            fields="files(id, name)"
+        ).execute()
     files = results.get('files', [])
     if not files:
         return []
@@ -241,10 +258,11 @@ def get_tab_records(day="today"):
 def get_week_records():
     date = TODAY
     sheet_title = get_sheet_title(date)
-    results = DRIVE_SERVICE.files().list(
-        q=f"'{FOLDER_ID}' in parents and name='{sheet_title}' and mimeType='application/vnd.google-apps.spreadsheet'",
-        fields="files(id, name)"
-    ).execute()
+    with get_drive_pool().service() as drive:
+        results = drive.files().list(
+            q=f"'{FOLDER_ID}' in parents and name='{sheet_title}' and mimeType='application/vnd.google-apps.spreadsheet'",
+            fields="files(id, name)"
+        ).execute()
     files = results.get('files', [])
     if not files:
         return []
@@ -266,10 +284,11 @@ def get_week_records():
 
 def get_month_records():
     # Master Misses Log: must be named exactly as such in folder
-    results = DRIVE_SERVICE.files().list(
-        q=f"'{FOLDER_ID}' in parents and name = 'Master Misses Log' and mimeType = 'application/vnd.google-apps.spreadsheet'",
-        fields="files(id, name)"
-    ).execute()
+    with get_drive_pool().service() as drive:
+        results = drive.files().list(
+            q=f"'{FOLDER_ID}' in parents and name = 'Master Misses Log' and mimeType = 'application/vnd.google-apps.spreadsheet'",
+            fields="files(id, name)"
+        ).execute()
     files = results.get('files', [])
     if not files:
         return []
@@ -283,10 +302,11 @@ def get_month_records():
     return filtered
 
 def get_all_time_records():
-    results = DRIVE_SERVICE.files().list(
-        q=f"'{FOLDER_ID}' in parents and name = 'Master Misses Log' and mimeType = 'application/vnd.google-apps.spreadsheet'",
-        fields="files(id, name)"
-    ).execute()
+    with get_drive_pool().service() as drive:
+        results = drive.files().list(
+            q=f"'{FOLDER_ID}' in parents and name = 'Master Misses Log' and mimeType = 'application/vnd.google-apps.spreadsheet'",
+            fields="files(id, name)"
+        ).execute()
     files = results.get('files', [])
     if not files:
         return []